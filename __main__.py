@@ -1,13 +1,147 @@
+import asyncio
+import atexit
+from contextlib import ExitStack
+from dataclasses import dataclass, field, fields, MISSING
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_EVEN
+from functools import lru_cache
+from importlib.resources import as_file
+import math
 import os
+import pathlib
 from prompt_toolkit import prompt
-from prompt_toolkit.shortcuts import message_dialog, button_dialog, input_dialog
+from prompt_toolkit.application import Application
+from prompt_toolkit.key_binding import KeyBindings, merge_key_bindings
+from prompt_toolkit.key_binding.bindings.focus import focus_next, focus_previous
+from prompt_toolkit.key_binding.defaults import load_key_bindings
+from prompt_toolkit.layout import D, DynamicContainer, HSplit, Layout
+from prompt_toolkit.widgets import Button, Dialog, Label, TextArea
+import pickle
 import sys
-import toml
-import types
+import tomllib
 import typing as t
+import warnings
+import zipfile
 
 
-config = types.SimpleNamespace(**toml.load("settings.toml"))
+@dataclass(frozen=True, slots=True)
+class Config:
+    """
+    The program's settings, as loaded from settings.toml.
+
+    Attributes:
+        SERIAL_PORT: The serial port of the printer.
+        FILAMENT_RATE: The price of 3D printing per gram of filament.
+        SUBLIMATION_RATE: The price of sublimation per page.
+        MUG_RATE: The price of a mug.
+        PRINTER_PROFILE: The printer's profile in capabilities.json,
+            or None to use the default profile.
+        SUBLIMATION_RATE_STR: SUBLIMATION_RATE, formatted for receipts.
+        MUG_RATE_STR: MUG_RATE, formatted for receipts.
+        FILAMENT_RATE_STR: FILAMENT_RATE, formatted for receipts.
+    """
+    SERIAL_PORT: str
+    FILAMENT_RATE: float
+    SUBLIMATION_RATE: float
+    MUG_RATE: float
+    PRINTER_PROFILE: t.Optional[str] = None
+
+    SUBLIMATION_RATE_STR: str = field(init=False)
+    MUG_RATE_STR: str = field(init=False)
+    FILAMENT_RATE_STR: str = field(init=False)
+
+    def __post_init__(self):
+        # The rates never change while the program is running, so they only
+        # need to be formatted once. The filament rate is per gram, and may be
+        # a fraction of a cent, so it's printed as is.
+        object.__setattr__(self, "SUBLIMATION_RATE_STR", f"{self.SUBLIMATION_RATE:.2f}")
+        object.__setattr__(self, "MUG_RATE_STR", f"{self.MUG_RATE:.2f}")
+        object.__setattr__(self, "FILAMENT_RATE_STR", str(self.FILAMENT_RATE))
+
+    @classmethod
+    def from_settings(cls, data: dict) -> "Config":
+        """
+        Create a Config from the parsed settings file.
+
+        Unknown settings are ignored with a warning, so that a settings
+        file with settings this version doesn't use still loads.
+
+        Args:
+            data: A dict containing the parsed settings.
+        
+        Returns:
+            The Config.
+
+        Raises:
+            ValueError: If a required setting is missing.
+        """
+        settings = [f for f in fields(cls) if f.init]
+        names = {f.name for f in settings}
+
+        unknown = sorted(set(data) - names)
+        if unknown:
+            warnings.warn(f"Ignoring unknown settings: {', '.join(unknown)}")
+
+        missing = [f.name for f in settings if f.default is MISSING and f.name not in data]
+        if missing:
+            raise ValueError(f"Missing settings: {', '.join(missing)}")
+
+        return cls(**{name: value for name, value in data.items() if name in names})
+
+
+def load_config(path: str) -> Config:
+    """
+    Load the settings file, reusing a cached copy of the parsed
+    settings when the file hasn't changed since the last launch.
+
+    The cache is stored next to the settings file, and is keyed on the
+    file's modification time and size.
+
+    Args:
+        path: A string containing the path to the settings file.
+    
+    Returns:
+        A Config containing the settings.
+
+    Raises:
+        OSError: If the settings file can't be read.
+        ValueError: If the settings file is invalid.
+    """
+    cache_path = f"{path}.cache"
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+
+    try:
+        with open(cache_path, "rb") as f:
+            cached_key, data = pickle.load(f)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        cached_key = None
+    if cached_key == key:
+        return Config.from_settings(data)
+
+    data = tomllib.loads(pathlib.Path(path).read_text("utf-8"))
+
+    # Write to a temporary file first, so that an interrupted write
+    # never leaves a half-written cache behind.
+    try:
+        with open(f"{cache_path}.tmp", "wb") as f:
+            pickle.dump((key, data), f)
+        os.replace(f"{cache_path}.tmp", cache_path)
+    except OSError:
+        pass
+    return Config.from_settings(data)
+
+
+try:
+    config = load_config("settings.toml")
+except (OSError, ValueError) as e:
+    sys.exit(f"Unable to load settings.toml: {e}")
+
+# Prices are rounded down to a multiple of this amount.
+_NICKEL = Decimal("0.05")
+
+# Prices are snapped to this many decimal places before rounding down,
+# which absorbs float error such as 3 * 0.15 = 0.44999999999999996.
+_SNAP_PLACES = 9
 
 
 def round_down(number: float, decimal_places: t.Optional[int]=2) -> float:
@@ -15,6 +149,12 @@ def round_down(number: float, decimal_places: t.Optional[int]=2) -> float:
     Round down according to the library's rules. Prices are
     rounded down to the nearest nickel.
 
+    The number is truncated toward zero to the given number of decimal
+    places, and then to a multiple of five cents, so a price never rounds
+    up (1.049 becomes 1.00, and -1.23 becomes -1.20). Float error from
+    calculating the price is absorbed first, so 3 * 0.15, which comes out
+    as 0.44999999999999996, still becomes 0.45.
+
     Args:
         number: The number to round down.
         decimal_places: The number of decimal places to round to.
@@ -22,21 +162,106 @@ def round_down(number: float, decimal_places: t.Optional[int]=2) -> float:
     Returns:
         The rounded down float.
     """
-    number = round(number, decimal_places)
-    
-    if len(str(number).split(".")[-1]) == 1:
-        return float(number)
+    # Going through str() gives us the decimal value the user actually
+    # sees, rather than the binary approximation of the float. Snapping it
+    # to _SNAP_PLACES decimal places then absorbs the error picked up by
+    # any arithmetic done on the price, before it's truncated.
+    price = Decimal(str(number)).quantize(
+        Decimal(1).scaleb(-_SNAP_PLACES),
+        rounding=ROUND_HALF_EVEN
+    ).quantize(
+        Decimal(1).scaleb(-decimal_places),
+        rounding=ROUND_DOWN
+    )
+    nickels = (price / _NICKEL).quantize(Decimal(1), rounding=ROUND_DOWN)
+    return float(nickels * _NICKEL)
+
+
+def _round_down_float(number: float) -> float:
+    """
+    Round down a float with the same rules as round_down(), using only
+    float and integer arithmetic, so that Numba can compile it.
+
+    round_down() works on the shortest decimal representation of the
+    float, snapped to 9 decimal places with ties to even. That snapped
+    value is at least n cents exactly when the decimal is at least n cents
+    minus half a billionth, which in turn holds exactly when the float is
+    at least the float nearest to that. So we look for the largest such n.
+    This relies on n cents minus half a billionth having at most 15
+    significant digits, which holds for prices below _MAX_BATCH_PRICE.
+
+    Args:
+        number: The number to round down.
     
-    if str(number).endswith("0") or str(number).endswith("5"):
-        return number
+    Returns:
+        The rounded down float.
+    """
+    size = abs(number)
+    cents = int(size * 100)
+    while (cents * 10_000_000 - 5) / 1e9 > size:
+        cents -= 1
+    while ((cents + 1) * 10_000_000 - 5) / 1e9 <= size:
+        cents += 1
+
+    nickels = cents - cents % 5
+    if number < 0:
+        nickels = -nickels
+    return nickels / 100
+
+
+# The largest price round_down_many() accepts. See _round_down_float().
+_MAX_BATCH_PRICE = 100_000
+
+
+@lru_cache(maxsize=None)
+def _nickel_rounder() -> t.Optional[t.Callable]:
+    """
+    Compile a vectorized version of _round_down_float() with Numba.
+    This is done on first use, so that Numba isn't imported at startup.
+
+    Returns:
+        The compiled function, or None if Numba isn't installed.
+    """
+    try:
+        from numba import float64, vectorize
+    except ImportError:
+        return None
+
+    return vectorize([float64(float64)], cache=True)(_round_down_float)
+
+
+def round_down_many(numbers: t.Iterable[float]) -> t.List[float]:
+    """
+    Round down many prices at once, according to the same rules as
+    round_down(). This is meant for rounding whole batches of receipts.
+
+    If Numba is installed, the rounding is compiled to native code and
+    applied to all of the prices in one go. Otherwise, this falls back
+    to calling round_down() on each price.
+
+    Args:
+        numbers: The prices to round down.
     
-    if str(number)[-1] in ["1", "2", "3", "4"]:
-        if len(str(number).split(".")[-1]) > 1:
-            return float(f"{str(number)[0:-1]}0")
-        else:
-            return float(f"{str(number)}0")
-    else:
-        return float(f"{str(number)[0:-1]}5")
+    Returns:
+        A list of the rounded down floats.
+
+    Raises:
+        ValueError: If any price isn't finite, or isn't below _MAX_BATCH_PRICE.
+    """
+    error = f"Prices must be finite and below {_MAX_BATCH_PRICE}"
+
+    rounder = _nickel_rounder()
+    if rounder is None:
+        numbers = list(numbers)
+        if not all(math.isfinite(number) and abs(number) < _MAX_BATCH_PRICE for number in numbers):
+            raise ValueError(error)
+        return [round_down(number) for number in numbers]
+
+    import numpy as np
+    numbers = np.fromiter(numbers, dtype=np.float64)
+    if not np.all(np.isfinite(numbers) & (np.abs(numbers) < _MAX_BATCH_PRICE)):
+        raise ValueError(error)
+    return rounder(numbers).tolist()
 
 
 def format_currency(number) -> str:
@@ -49,35 +274,81 @@ def format_currency(number) -> str:
     Returns:
         A string containing the formatted number.
     """
-    if len(str(number).split(".")[-1]) == 1:
-        return f"{number}0"
-    else:
-        return str(number)
+    return f"{float(number):.2f}"
+
+
+# When compiled with PyInstaller, resources are unpacked to a temporary
+# directory at runtime. Otherwise, they're relative to the working directory,
+# unless we're running from a zipapp, in which case they're in the archive.
+try:
+    _BASE_PATH = sys._MEIPASS
+except Exception:
+    _BASE_PATH = os.path.abspath(".")
 
+_ARCHIVE_PATH = os.path.dirname(os.path.abspath(__file__))
+if not os.path.isfile(_ARCHIVE_PATH):
+    _ARCHIVE_PATH = None
 
+# Resources extracted from the zipapp are removed again on exit.
+_extracted_resources = ExitStack()
+atexit.register(_extracted_resources.close)
+
+
+@lru_cache(maxsize=None)
 def resource_path(relative_path: str) -> str:
     """
     Obtain a resource path from a relative path. This is used
     to access resources when the program is compiled to a binary
     for production use.
 
+    When running from a zipapp, the resource is extracted to a
+    temporary file the first time it's requested.
+
     Args:
         relative_path: A string containing the relative path.
     
     Returns:
         A string containing the resource path.
     """
-    try:
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
+    if _ARCHIVE_PATH is not None:
+        resource = zipfile.Path(_ARCHIVE_PATH, relative_path)
+        return str(_extracted_resources.enter_context(as_file(resource)))
+    return os.path.join(_BASE_PATH, relative_path)
+
 
+def capabilities_path() -> str:
+    """
+    Obtain a path to the printer's capabilities file which stays the
+    same from one launch to the next.
 
-# Before importing the printer connection library, we have to
-# set the resource path for the printer's capabilities.
-os.environ['ESCPOS_CAPABILITIES_FILE'] = resource_path("assets/capabilities.json")
-from escpos.printer import Serial
+    The printer library caches the parsed capabilities, but parses them
+    again whenever the capabilities file is newer than its cache. When
+    compiled to a binary or run from a zipapp, resources are unpacked
+    anew on every launch, so a copy is kept in the working directory
+    instead, and only rewritten when the bundled file changes.
+
+    Returns:
+        A string containing the path to the capabilities file.
+    """
+    source = resource_path("assets/capabilities.json")
+    if _ARCHIVE_PATH is None and not hasattr(sys, "_MEIPASS"):
+        return source
+
+    target = os.path.abspath("capabilities.json")
+    data = pathlib.Path(source).read_bytes()
+    try:
+        if pathlib.Path(target).read_bytes() == data:
+            return target
+    except OSError:
+        pass
+
+    try:
+        with open(f"{target}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{target}.tmp", target)
+    except OSError:
+        return source
+    return target
 
 
 class MakeItReceiptPrinter:
@@ -86,20 +357,147 @@ class MakeItReceiptPrinter:
 
     Attributes:
         self._printer: The serial connection to the actual receipt printer.
+            This is None until the first receipt is printed.
+        self._header_bytes: The header of the receipt, already converted to
+            printer commands. This is None until the first receipt is printed.
     """
+    __slots__ = ("_printer", "_header_bytes")
+
     def __init__(self):
-        self._printer = Serial(devfile=config.SERIAL_PORT)
-        self._printer.close()
+        self._printer = None
+        self._header_bytes = None
+        atexit.register(self._disconnect)
+
+    def _connect(self) -> None:
+        """
+        Create the serial connection to the printer if it doesn't
+        exist yet. The printer library is only imported here, so that
+        startup doesn't pay for it if nothing is ever printed.
+
+        Raises:
+            ConnectionError: If the serial port couldn't be opened.
+        """
+        if self._printer is not None:
+            return
+
+        # Before importing the printer connection library, we have to
+        # set the path for the printer's capabilities. Parsing them is
+        # slow, so the library caches the parsed capabilities, but by
+        # default in a new temporary directory on every launch. Keep that
+        # cache next to our own settings cache instead.
+        os.environ['ESCPOS_CAPABILITIES_FILE'] = capabilities_path()
+        os.environ['ESCPOS_CAPABILITIES_PICKLE_DIR'] = os.path.abspath(".")
+        from escpos.exceptions import DeviceNotFoundError
+        from escpos.printer import Dummy, Serial
+
+        # The header is the same on every receipt, so we only build it once.
+        # The logo is normally converted into printer commands ahead of time
+        # by rasterize_logo.py, but if that hasn't been done, convert it here.
+        if self._header_bytes is None:
+            header = Dummy(profile=config.PRINTER_PROFILE)
+            header.set(align='center', normal_textsize=True)
+            try:
+                with open(resource_path("assets/makeit.escpos.bin"), "rb") as f:
+                    header._raw(f.read())
+            except OSError:
+                header.image(resource_path("assets/makeit.png"))
+            header.text("Northville District Library\n")
+            header.set(align='center')
+            self._header_bytes = header.output
+
+        # Opening the port takes a while, so it's kept open for the rest
+        # of the session rather than being reopened for every receipt.
+        printer = Serial(devfile=config.SERIAL_PORT, profile=config.PRINTER_PROFILE)
+        try:
+            printer.open()
+        except DeviceNotFoundError as e:
+            raise ConnectionError(str(e)) from e
+        self._printer = printer
+        self._set_low_latency()
+
+    def _disconnect(self) -> None:
+        """
+        Close the serial connection to the printer, if there is one.
+        The next receipt printed will open it again.
+        """
+        if self._printer is None:
+            return
+        try:
+            self._printer.close()
+        except OSError:
+            pass
+        self._printer = None
+
+    def _set_low_latency(self) -> None:
+        """
+        Ask the OS to send serial writes right away instead of
+        buffering them. By default, USB serial adapters hold small writes
+        for up to 16ms, and a receipt is made up of many small writes.
+
+        This is only supported on Linux. Elsewhere, or if we lack the
+        permissions to change it, the port is left as is.
+        """
+        try:
+            self._printer.device.set_low_latency_mode(True)
+        except (AttributeError, OSError, ValueError):
+            pass
+
+        # FTDI adapters also have a latency timer of their own.
+        name = os.path.basename(os.path.realpath(config.SERIAL_PORT))
+        try:
+            with open(f"/sys/bus/usb-serial/devices/{name}/latency_timer", "w") as f:
+                f.write("1")
+        except OSError:
+            pass
     
-    def _print_header(self) -> None:
-        """Print the header of the receipt."""
-        self._printer.set(align='center', normal_textsize=True)
-        self._printer.image(resource_path("assets/makeit.png"))
-        self._printer.text("Northville District Library\n")
+    def _new_receipt(self):
+        """
+        Create a buffer to build a receipt in.
+
+        Each command sent to the printer becomes its own small serial
+        write, so receipts are built up in memory first and then sent
+        all at once by _send().
+
+        Returns:
+            A Dummy printer which collects the receipt's commands.
+        """
+        self._connect()
+        from escpos.printer import Dummy
+        return Dummy(profile=config.PRINTER_PROFILE)
+
+    def _send(self, receipt) -> None:
+        """
+        Send a receipt to the printer in a single write.
+
+        If the write fails, the receipt isn't sent again automatically,
+        since part of it may already have been printed, and resending it
+        could print it twice. The connection is closed instead, so that
+        the next receipt reopens the port, in case the printer was
+        switched off or unplugged since the last one.
+
+        Args:
+            receipt: The Dummy printer the receipt was built in.
+
+        Returns:
+            None
+
+        Raises:
+            ConnectionError: If the receipt couldn't be sent.
+        """
+        self._connect()
+        try:
+            self._printer._raw(receipt.output)
+        except OSError as e:
+            self._disconnect()
+            raise ConnectionError(f"Unable to print to {config.SERIAL_PORT}:\n{e}") from e
     
-    def _print_footer(self) -> None:
+    def _print_header(self, receipt) -> None:
+        """Print the header of the receipt, leaving the text centered."""
+        receipt._raw(self._header_bytes)
+    
+    def _print_footer(self, receipt) -> None:
         """Print the footer of the receipt."""
-        self._printer.text("\n\n")
+        receipt.text("\n\n")
 
     def print_sublimation(self, pages: int, cups: t.Optional[int]=0) -> None:
         """
@@ -115,29 +513,29 @@ class MakeItReceiptPrinter:
 
         Returns:
             None
-        """
-        self._printer.open()
-        self._print_header()
 
-        self._printer.set(align='center')
-        self._printer.text("Sublimation\n\n")
+        Raises:
+            ConnectionError: If the receipt couldn't be printed.
+        """
+        receipt = self._new_receipt()
+        self._print_header(receipt)
+        receipt.text("Sublimation\n\n")
 
-        self._printer.set(align='left')
-        self._printer.set(double_height=True, double_width=True)
+        receipt.set(align='left', double_height=True, double_width=True)
 
-        self._printer.text(f"Pages:  {pages}\n")
-        self._printer.text(f"Rate:   ${format_currency(config.SUBLIMATION_RATE)}/page\n")
+        receipt.text(f"Pages:  {pages}\n")
+        receipt.text(f"Rate:   ${config.SUBLIMATION_RATE_STR}/page\n")
         
         # Omit printing of the cup portion if no cups are used.
         if cups != 0:
-            self._printer.text(f"Mugs:   {cups}\n")
-            self._printer.text(f"Rate:   ${format_currency(config.MUG_RATE)}/mug\n\n")
+            receipt.text(f"Mugs:   {cups}\n")
+            receipt.text(f"Rate:   ${config.MUG_RATE_STR}/mug\n\n")
 
         cost = (pages * config.SUBLIMATION_RATE) + (cups * config.MUG_RATE)
-        self._printer.text(f"Cost:   ${format_currency(cost)}\n\n")
-        self._print_footer()
-        self._printer.cut()
-        self._printer.close()
+        receipt.text(f"Cost:   ${format_currency(cost)}\n\n")
+        self._print_footer(receipt)
+        receipt.cut()
+        self._send(receipt)
 
 
     def print_3dp(self, name: str, weight: float) -> None:
@@ -152,26 +550,27 @@ class MakeItReceiptPrinter:
 
         Returns:
             None
+
+        Raises:
+            ConnectionError: If the receipt couldn't be printed.
         """
-        self._printer.open()
+        receipt = self._new_receipt()
         
-        self._print_header()
+        self._print_header(receipt)
 
         cost = weight * config.FILAMENT_RATE
 
-        self._printer.set(align='center')
-        self._printer.text("3D Print Job\n\n")
+        receipt.text("3D Print Job\n\n")
 
-        self._printer.set(align='left')
-        self._printer.set(double_height=True, double_width=True)
-        self._printer.text(f"{name}\n\n")
+        receipt.set(align='left', double_height=True, double_width=True)
+        receipt.text(f"{name}\n\n")
 
-        self._printer.text(f"Weight: {weight}g\n")
-        self._printer.text(f"Rate:   ${config.FILAMENT_RATE}/g\n\n")
-        self._printer.text(f"Cost:   ${format_currency(round_down(cost))}\n\n")
-        self._print_footer()
-        self._printer.cut()
-        self._printer.close()
+        receipt.text(f"Weight: {weight}g\n")
+        receipt.text(f"Rate:   ${config.FILAMENT_RATE_STR}/g\n\n")
+        receipt.text(f"Cost:   ${format_currency(round_down(cost))}\n\n")
+        self._print_footer(receipt)
+        receipt.cut()
+        self._send(receipt)
 
 
 
@@ -179,27 +578,159 @@ class ReceiptOMatic:
     """
     Class abstracts the program itself.
 
+    Every screen of the TUI is shown in the same Application, rather
+    than building and tearing down a new one for each dialog.
+
     Attributes:
         self.printer: A MakeItReceiptPrinter which allows us to print.
+        self._title: The title of the screen currently shown.
+        self._text: The text of the screen currently shown.
+        self._menu_buttons: The buttons of the main menu.
+        self._entry: The text field of the input screen.
+        self._message_button: The button of the message screen.
+        self._menu: The main menu screen.
+        self._input: The screen used to ask for information.
+        self._message: The screen used to show a message.
+        self._screen: The screen currently shown.
+        self._app: The Application all of the screens are shown in.
+        self._loop: The event loop the Application is run in.
     """
+    __slots__ = (
+        "printer",
+        "_title",
+        "_text",
+        "_menu_buttons",
+        "_entry",
+        "_message_button",
+        "_menu",
+        "_input",
+        "_message",
+        "_screen",
+        "_app",
+        "_loop"
+    )
+
     def __init__(self):
         self.printer = MakeItReceiptPrinter()
 
+        self._title = ""
+        self._text = ""
+
+        self._menu_buttons = [
+            Button(text="3D Printing", handler=lambda: self._app.exit(result="prompt_3dp")),
+            Button(text="Sublimation", handler=lambda: self._app.exit(result="prompt_sub")),
+            Button(text="Quit", handler=lambda: self._app.exit(result="quit"))
+        ]
+        self._menu = self._create_screen(self._menu_buttons)
+
+        ok_button = Button(text="OK", handler=lambda: self._app.exit(result=self._entry.text))
+
+        def accept(buffer) -> bool:
+            self._app.layout.focus(ok_button)
+            return True
+
+        self._entry = TextArea(multiline=False, accept_handler=accept)
+        self._input = self._create_screen(
+            [ok_button, Button(text="Cancel", handler=lambda: self._app.exit())],
+            entry=self._entry
+        )
+
+        self._message_button = Button(text="Ok", handler=lambda: self._app.exit())
+        self._message = self._create_screen([self._message_button])
+
+        bindings = KeyBindings()
+        bindings.add("tab")(focus_next)
+        bindings.add("s-tab")(focus_previous)
+
+        self._screen = self._menu
+        self._app = Application(
+            layout=Layout(DynamicContainer(lambda: self._screen)),
+            key_bindings=merge_key_bindings([load_key_bindings(), bindings]),
+            mouse_support=True,
+            full_screen=True
+        )
+        self._loop = asyncio.new_event_loop()
+
+    def _create_screen(self, buttons: t.List[Button], entry: t.Optional[TextArea]=None) -> Dialog:
+        """
+        Create a dialog which shows the current title and text.
+
+        Args:
+            buttons: The buttons of the dialog.
+            entry: An optional text field, shown below the text.
+        
+        Returns:
+            The Dialog.
+        """
+        body = Label(text=lambda: self._text, dont_extend_height=True)
+        if entry is not None:
+            body = HSplit([body, entry], padding=D(preferred=1, max=1))
+
+        return Dialog(
+            title=lambda: self._title,
+            body=body,
+            buttons=buttons,
+            with_background=True
+        )
+
+    def _show(self, screen: Dialog, title: str, text: str, focus) -> t.Any:
+        """
+        Show a screen, and wait for the user to pick one of its buttons.
+
+        Args:
+            screen: The screen to show.
+            title: A string containing the title of the TUI window.
+            text: The text to be displayed on the screen.
+            focus: The element of the screen to focus initially.
+        
+        Returns:
+            The result of the button the user picked.
+        """
+        self._screen = screen
+        self._title = title
+        self._text = text
+        self._app.layout.focus(focus)
+        return self._loop.run_until_complete(self._app.run_async())
+
+    def _ask(self, title: str, text: str) -> t.Optional[str]:
+        """
+        Ask the user to enter some text.
+
+        Args:
+            title: A string containing the title of the TUI window.
+            text: The text to be displayed during the prompt.
+        
+        Returns:
+            A string containing the text entered, or None if cancelled.
+        """
+        self._entry.text = ""
+        return self._show(self._input, title, text, focus=self._entry)
+
+    def _tell(self, title: str, text: str) -> None:
+        """
+        Show the user a message, and wait for them to acknowledge it.
+
+        Args:
+            title: A string containing the title of the TUI window.
+            text: The message to be displayed.
+        
+        Returns:
+            None
+        """
+        self._show(self._message, title, text, focus=self._message_button)
+
     def main(self) -> None:
         """Main function which starts the program."""
-        result = button_dialog(
-            title="Receipt-O-Matic",
-            text="Select an option...",
-            buttons=[
-                ('3D Printing', "prompt_3dp"),
-                ('Sublimation', "prompt_sub"),
-                ('Quit', "quit")
-            ]
-        ).run()
-
-        getattr(self, result)()
+        while True:
+            result = self._show(
+                self._menu,
+                "Receipt-O-Matic",
+                "Select an option...",
+                focus=self._menu_buttons[0]
+            )
+            getattr(self, result)()
     
-    def prompt_type(self, type_caster: t.Callable, title: str, text: str) -> float:
+    def prompt_type(self, type_caster: t.Callable, title: str, text: str) -> t.Optional[float]:
         """
         Prompts the user for a particular type of information.
 
@@ -213,47 +744,52 @@ class ReceiptOMatic:
             text: The text to be displayed during the prompt.
         
         Returns:
-            A float containing the number entered during the prompt.
+            A float containing the number entered during the prompt, or None
+            if the prompt was cancelled.
         """
-        try:
-            number = input_dialog(
-                title=title,
-                text=text
-            ).run()
-            number = type_caster(number)
-        except ValueError:
-            message_dialog(
-                title=title,
-                text=f"Invalid entry '{number}'"
-            )
-            return self.prompt_type(type_caster, title, text)
-        return number
+        while True:
+            number = self._ask(title, text)
+            if number is None:
+                return None
+
+            try:
+                return type_caster(number)
+            except ValueError:
+                self._tell(title, f"Invalid entry '{number}'")
     
     def prompt_3dp(self) -> None:
         """
         Prompts the user for the information of a 3D print job,
-        then prints the receipt for said job.
+        then prints the receipt for said job. Cancelling any of the
+        prompts returns to the main menu without printing. If the
+        receipt can't be printed, the user is told why.
         
         Returns:
             None
         """
-        name = input_dialog(
-            title="3D Print Job",
-            text="Enter Patron's Name:"
-        ).run()
+        name = self._ask("3D Print Job", "Enter Patron's Name:")
+        if name is None:
+            return
 
         weight = self.prompt_type(
             float,
             "3D Print Job",
             "Enter the weight in grams:"
         )
-        self.printer.print_3dp(name, weight)
-        self.main()
+        if weight is None:
+            return
+
+        try:
+            self.printer.print_3dp(name, weight)
+        except ConnectionError as e:
+            self._tell("3D Print Job", f"The receipt couldn't be printed.\n\n{e}")
     
     def prompt_sub(self) -> None:
         """
         Prompts the user for the information of a sublimation job,
-        then prints the receipt for said job.
+        then prints the receipt for said job. Cancelling any of the
+        prompts returns to the main menu without printing. If the
+        receipt can't be printed, the user is told why.
         
         Returns:
             None
@@ -263,14 +799,21 @@ class ReceiptOMatic:
             "Sublimation",
             "Enter the number of pages printed:"
         )
+        if pages is None:
+            return
 
         mugs = self.prompt_type(
             int,
             "Sublimation",
             "Enter the number of mugs purchased:"
         )
-        self.printer.print_sublimation(pages, cups=mugs)
-        self.main()
+        if mugs is None:
+            return
+
+        try:
+            self.printer.print_sublimation(pages, cups=mugs)
+        except ConnectionError as e:
+            self._tell("Sublimation", f"The receipt couldn't be printed.\n\n{e}")
     
     def quit(self) -> None:
         """Exits the program."""
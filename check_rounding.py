@@ -0,0 +1,146 @@
+"""
+Check that round_down_many() rounds exactly like round_down().
+
+round_down_many() is compiled with Numba when it's installed, and falls
+back to round_down() otherwise. This script checks both paths, as well as
+the plain Python version of the compiled function, over a grid of prices,
+negative prices, prices sitting right next to a nickel or a cent, and
+costs calculated from filament rates. It also checks that both paths
+reject prices which can't be rounded, such as infinity and NaN.
+It should be run from the directory containing settings.toml.
+"""
+import importlib.util
+import math
+import os
+import random
+import sys
+
+
+def load_program():
+    """
+    Load __main__.py as a module, without starting the TUI.
+
+    Returns:
+        The loaded module.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__main__.py")
+    spec = importlib.util.spec_from_file_location("receipt_o_matic", path)
+    module = importlib.util.module_from_spec(spec)
+
+    # Numba's on-disk cache records the module the compiled function came
+    # from, and imports it again when loading the cache on the next run.
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def prices() -> list:
+    """
+    Build the prices to check.
+
+    Returns:
+        A list of floats.
+    """
+    numbers = [i / 1000 for i in range(100000)]
+    numbers += [-number for number in numbers]
+
+    # The floats on either side of every whole cent.
+    for cents in range(-10000, 10000):
+        number = cents / 100
+        numbers += [math.nextafter(number, -math.inf), math.nextafter(number, math.inf)]
+
+    numbers += [0.045, 1.045, 0.145, 2.675, 1.15, 0.04499999999, 0.05 * 3, 12.5 * 0.05]
+
+    # Costs as calculated for 3D print jobs, which pick up float error.
+    for rate in (0.03, 0.05, 0.15):
+        numbers += [(weight / 10) * rate for weight in range(20000)]
+
+    generator = random.Random(0)
+    numbers += [generator.uniform(-500, 500) for _ in range(100000)]
+    return numbers
+
+
+def compare(name: str, expected: list, actual: list) -> bool:
+    """
+    Report any prices which weren't rounded as expected.
+
+    Args:
+        name: A string describing what was checked.
+        expected: The results of round_down().
+        actual: The results being checked.
+
+    Returns:
+        True if everything matched.
+    """
+    mismatches = [(e, a) for e, a in zip(expected, actual) if e != a]
+    if len(actual) != len(expected):
+        mismatches.append((len(expected), len(actual)))
+    print(f"{name}: {len(mismatches)} mismatches")
+    for e, a in mismatches[:10]:
+        print(f"    expected {e}, got {a}")
+    return not mismatches
+
+
+def rejects(name: str, round_down_many) -> bool:
+    """
+    Check that prices which can't be rounded are rejected.
+
+    Args:
+        name: A string describing what was checked.
+        round_down_many: The function to check.
+
+    Returns:
+        True if every such price was rejected.
+    """
+    accepted = []
+    for number in (math.inf, -math.inf, math.nan, 1e18, -1e18, 100000.0):
+        try:
+            round_down_many([1.0, number])
+        except ValueError:
+            continue
+        accepted.append(number)
+    print(f"{name}: {len(accepted)} invalid prices accepted")
+    for number in accepted:
+        print(f"    {number}")
+    return not accepted
+
+
+if __name__ == "__main__":
+    program = load_program()
+    numbers = prices()
+    expected = [program.round_down(number) for number in numbers]
+
+    known = [(0.44999999999999996, 0.45), (3 * 0.15, 0.45), (0.045, 0.0), (1.049, 1.0), (-1.23, -1.2)]
+    ok = compare(
+        "round_down (known values)",
+        [e for _, e in known],
+        [program.round_down(number) for number, _ in known]
+    )
+
+    ok &= compare(
+        "_round_down_float",
+        expected,
+        [program._round_down_float(number) for number in numbers]
+    )
+
+    if program._nickel_rounder() is None:
+        print("Numba isn't installed, skipping the compiled path.")
+    else:
+        ok &= compare("round_down_many (Numba, list)", expected, program.round_down_many(numbers))
+        ok &= compare(
+            "round_down_many (Numba, generator)",
+            expected,
+            program.round_down_many(number for number in numbers)
+        )
+        ok &= rejects("round_down_many (Numba)", program.round_down_many)
+
+    # Force the fallback path, as if Numba weren't installed.
+    program._nickel_rounder = lambda: None
+    ok &= compare(
+        "round_down_many (fallback, generator)",
+        expected,
+        program.round_down_many(number for number in numbers)
+    )
+    ok &= rejects("round_down_many (fallback)", program.round_down_many)
+
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,48 @@
+"""
+Convert the receipt header logo into printer commands ahead of time.
+
+The result is written to assets/makeit.escpos.bin, which the program sends
+to the printer as is, instead of decoding and dithering the PNG at runtime.
+This script needs Pillow and NumPy, and should be re-run whenever
+assets/makeit.png changes.
+"""
+import numpy as np
+from PIL import Image
+
+
+SOURCE = "assets/makeit.png"
+TARGET = "assets/makeit.escpos.bin"
+
+
+def rasterize(path: str) -> bytes:
+    """
+    Convert an image into a GS v 0 raster bit image command.
+
+    Transparent areas are treated as white, and every pixel darker than
+    mid-gray is printed.
+
+    Args:
+        path: A string containing the path to the image.
+
+    Returns:
+        The bytes of the command.
+    """
+    image = Image.open(path).convert("RGBA")
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.split()[3])
+
+    gray = np.asarray(background.convert("L"))
+    bits = np.packbits(gray < 128, axis=1)
+    height, width_bytes = bits.shape
+
+    header = (
+        b"\x1dv0\x00"
+        + width_bytes.to_bytes(2, "little")
+        + height.to_bytes(2, "little")
+    )
+    return header + bits.tobytes()
+
+
+if __name__ == "__main__":
+    with open(TARGET, "wb") as f:
+        f.write(rasterize(SOURCE))